@@ -0,0 +1,93 @@
+"""
+Findly corpus backup tool
+Streams data.json out to NDJSON and back in, one document per line.
+
+  python corpus.py export backup.ndjson.gz
+  python corpus.py import backup.ndjson.gz --batch-size 5000
+
+Compression follows the file extension: .gz (gzip), .zst (zstd, needs the
+zstandard package) or anything else for plain NDJSON. Use "-" to export to
+stdout. An interrupted import resumes from <file>.checkpoint when re-run.
+
+import writes data.json directly. A running server reloads the file when it
+changes, but a write the server makes at the same moment can be lost, so
+stop the server first or use POST /import instead. The search index lives in
+the server process; rebuild it there with POST /reindex.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from main import (
+    IMPORT_BATCH_SIZE,
+    compress_chunks,
+    compression_for,
+    import_ndjson,
+    iter_export_chunks,
+    load_data,
+    read_ndjson_lines,
+)
+
+
+def export_command(args):
+    compression = args.compression or compression_for(args.path)
+    docs = load_data()  # read-only: no search index is built and data.json is not rewritten
+    chunks = compress_chunks(iter_export_chunks(docs), compression)
+    if args.path == "-":
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+        return
+    with open(args.path, "wb") as out:
+        for chunk in chunks:
+            out.write(chunk)
+    print(f"✅ Exported {len(docs)} documents to {args.path}", file=sys.stderr)
+
+
+def import_command(args):
+    checkpoint = Path(f"{args.path}.checkpoint")
+    skip_lines = int(checkpoint.read_text()) if checkpoint.exists() and not args.restart else 0
+    if skip_lines:
+        print(f"↪️  Resuming after line {skip_lines}", file=sys.stderr)
+
+    def save_checkpoint(line_no):
+        checkpoint.write_text(str(line_no))
+
+    compression = args.compression or compression_for(args.path)
+    with open(args.path, "rb") as raw:
+        stats = import_ndjson(
+            read_ndjson_lines(raw, compression),
+            batch_size=args.batch_size,
+            skip_lines=skip_lines,
+            on_commit=save_checkpoint,
+        )
+    checkpoint.unlink(missing_ok=True)
+    print(f"✅ Imported {stats['imported']} documents ({stats['skipped']} already present)", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Back up and restore the Findly corpus as NDJSON.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    exp = sub.add_parser("export", help="stream all documents to an NDJSON file")
+    exp.add_argument("path", help="output file, or - for stdout")
+    exp.add_argument("--compression", choices=["none", "gzip", "zstd"], help="override the extension-based choice")
+    exp.set_defaults(func=export_command)
+
+    imp = sub.add_parser("import", help="load documents from an NDJSON file (stop the server first)")
+    imp.add_argument("path")
+    imp.add_argument("--compression", choices=["none", "gzip", "zstd"], help="override the extension-based choice")
+    imp.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="documents per commit")
+    imp.add_argument("--restart", action="store_true", help="ignore any saved checkpoint")
+    imp.set_defaults(func=import_command)
+
+    args = parser.parse_args()
+    try:
+        args.func(args)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
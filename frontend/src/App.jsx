@@ -765,7 +765,15 @@ function DocumentsPage({ darkMode }) {
                 {doc.category || 'Uncategorized'}
               </span>
             </div>
-            <p className={`mb-4 line-clamp-3 ${darkMode ? 'text-gray-300' : 'text-gray-700'}`}>{doc.summary || 'No summary available'}</p>
+            {doc.thumbnail && (
+              <img
+                src={`${API_BASE}${doc.thumbnail}`}
+                alt=""
+                loading="lazy"
+                className={`mb-4 h-40 rounded-lg border object-cover object-top ${darkMode ? 'border-gray-700' : 'border-gray-200'}`}
+              />
+            )}
+            <p className={`mb-4 line-clamp-3 ${darkMode ? 'text-gray-300' : 'text-gray-700'}`}>{doc.summary || doc.snippet || 'No summary available'}</p>
             <div className="flex items-center justify-between">
               <div className={`flex flex-wrap gap-3 text-sm ${darkMode ? 'text-gray-400' : 'text-gray-600'}`}>
                 {doc.department && <span>🏢 {doc.department}</span>}
@@ -1,17 +1,24 @@
+import time
+
+_IMPORT_START = time.perf_counter()  # import time is measured from here
+
 from fastapi import FastAPI, UploadFile, File, Depends, HTTPException, Form, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse, JSONResponse, Response
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Iterable, Iterator, Callable, BinaryIO
 from pydantic import BaseModel, EmailStr, Field
-import shutil, json, fitz, os, re
+import shutil, json, os, re, uuid, math, threading, hashlib, mimetypes, gzip, io, zlib, heapq
+from concurrent.futures import ProcessPoolExecutor
+import anyio
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from email.utils import formatdate, parsedate_to_datetime
+from functools import lru_cache
 from pathlib import Path
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from dotenv import load_dotenv
-import numpy as np
 
 # Load environment variables
 load_dotenv()
@@ -21,21 +28,112 @@ SECRET_KEY = os.getenv("SECRET_KEY", "findly_secret_key_change_in_production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 120
 UPLOAD_DIR = Path("uploads")
+PREVIEW_DIR = Path("previews")
 DATA_FILE = Path("data.json")
 USER_FILE = Path("users.json")
 MAX_FILE_SIZE_MB = 10  # ✅ 10 MB limit
 ALLOWED_EXTENSIONS = [".pdf", ".docx", ".txt"]
 DEPARTMENTS = ["CSE", "ECE", "EEE", "MECH", "CIVIL", "IT", "ADMIN", "GENERAL"]
 DOCUMENT_TYPES = ["Project Report", "Research Paper", "Notes", "Assignment", "Circular", "Letter", "Meeting Minutes", "Thesis", "Lab Report", "Other"]
+THUMBNAIL_WIDTH = 320  # px
+SNIPPET_CHARS = 300
+PREVIEW_CACHE_CONTROL = "public, max-age=31536000, immutable"  # previews are content-addressed
+STREAM_CHUNK_SIZE = 64 * 1024
+EXPORT_CHUNK_SIZE = 64 * 1024
+IMPORT_BATCH_SIZE = 5000  # each batch commit rewrites data.json, so keep batches large
+COMPRESSIONS = ["none", "gzip", "zstd"]
+SIMILAR_QUERY_TERMS = 32  # strongest terms of a document used to find its neighbours
+SIMILAR_CACHE_SIZE = 512
+NORM_REFRESH_FRACTION = 0.1  # recompute all vector lengths once this share of the corpus has changed
+FACET_FIELDS = ["department", "category", "year"]
+EXTRACTION_ERROR_PREFIX = "[Error reading "  # stored as text when extraction fails
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")  # same tokens as TfidfVectorizer
+
+def process_age_seconds() -> Optional[float]:
+    """Seconds since this process started, read from /proc (Linux only)."""
+    try:
+        start_ticks = int(Path("/proc/self/stat").read_text().rsplit(")", 1)[1].split()[19])
+        uptime = float(Path("/proc/uptime").read_text().split()[0])
+        return max(uptime - start_ticks / os.sysconf("SC_CLK_TCK"), 0.0)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+# Time to first request counts from process start where the OS reports it, so
+# interpreter and uvicorn startup are included; otherwise from main.py's import.
+_process_age = process_age_seconds()
+_PROCESS_START = time.perf_counter() - _process_age if _process_age is not None else _IMPORT_START
+
+STARTUP_TIMINGS: Dict[str, Any] = {
+    "import_seconds": None,
+    "index_load_seconds": None,
+    "time_to_first_request_seconds": None,
+    "first_request_measured_from": "process_start" if _process_age is not None else "main_import",
+    "index_error": None,
+}
+
+
+# -------- lazy dependencies --------
+# PyMuPDF, scikit-learn, passlib/bcrypt and OpenAI are imported on first use,
+# so instances that only serve /stats or /login don't pay for all of them.
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
 
 # Optional: OpenAI Client
-try:
-    from openai import OpenAI
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-except Exception:
-    client = None
+@lru_cache(maxsize=None)
+def get_openai_client():
+    try:
+        from openai import OpenAI
+        return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    except Exception:
+        return None
+
+
+# Optional: zstd compression for corpus export/import
+@lru_cache(maxsize=None)
+def get_zstandard():
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
 
-app = FastAPI(title="Findly Backend 💎")
+def warm_index() -> None:
+    try:
+        get_index()
+    except Exception as e:
+        # Reported by /ready; the next request that needs the index retries the load
+        STARTUP_TIMINGS["index_error"] = f"{type(e).__name__}: {e}"
+        print("Index warm-up error:", e)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    print(f"⏱️ main.py imported in {STARTUP_TIMINGS['import_seconds']}s")
+    # Serve requests straight away; /ready turns green once the index is loaded
+    threading.Thread(target=warm_index, name="findly-index-warmup", daemon=True).start()
+    yield
+
+
+class FirstRequestTimer:
+    """Records how long after startup the first request was answered (see _PROCESS_START)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+        if scope["type"] == "http" and STARTUP_TIMINGS["time_to_first_request_seconds"] is None:
+            STARTUP_TIMINGS["time_to_first_request_seconds"] = round(time.perf_counter() - _PROCESS_START, 3)
+            origin = "process start" if STARTUP_TIMINGS["first_request_measured_from"] == "process_start" else "main.py import"
+            print(f"⏱️ first request answered {STARTUP_TIMINGS['time_to_first_request_seconds']}s after {origin}")
+
+
+app = FastAPI(title="Findly Backend 💎", lifespan=lifespan)
 
 # Allow frontend connection
 app.add_middleware(
@@ -45,9 +143,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(FirstRequestTimer)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 UPLOAD_DIR.mkdir(exist_ok=True)
+PREVIEW_DIR.mkdir(exist_ok=True)
 
 # -------- boot files --------
 if not DATA_FILE.exists():
@@ -60,7 +159,7 @@ if not USER_FILE.exists():
                 {
                     "email": "admin@findly.com",
                     "name": "Admin",
-                    "password": pwd_context.hash("admin123"),
+                    "password": get_pwd_context().hash("admin123"),
                     "role": "admin",
                     "branch": None,
                     "semester": None,
@@ -113,7 +212,468 @@ def load_data() -> list:
 
 
 def save_data(items: list) -> None:
-    DATA_FILE.write_text(json.dumps(items, indent=2), encoding="utf-8")
+    # Stream to a temp file and swap it in, so readers never see a half-written file
+    tmp_file = DATA_FILE.with_name(DATA_FILE.name + ".tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(items, f, indent=2)
+    os.replace(tmp_file, DATA_FILE)
+
+
+def new_document_id() -> str:
+    return uuid.uuid4().hex
+
+
+def assign_document_ids(items: list) -> bool:
+    """Give legacy records a stable id. Returns True if any record changed.
+
+    The id is derived from the record's content, matching what corpus.py export
+    writes for the same record; exact duplicates fall back to a random id.
+    """
+    changed = False
+    seen = {doc["id"] for doc in items if doc.get("id")}
+    for doc in items:
+        if not doc.get("id"):
+            doc_id = content_document_id(doc)
+            doc["id"] = doc_id if doc_id not in seen else new_document_id()
+            seen.add(doc["id"])
+            changed = True
+    return changed
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def term_counts(doc: dict) -> Counter:
+    # Only the extracted text is indexed, as /search always did; summaries may be
+    # placeholders ("AI summarization disabled") and filenames are date-stamped.
+    text = doc.get("text") or ""
+    if text.startswith(EXTRACTION_ERROR_PREFIX):
+        return Counter()  # "[Error reading PDF: ...]" is not document content
+    return Counter(tokenize(text))
+
+
+class DocumentIndex:
+    """In-memory view of data.json that is kept in sync on every write.
+
+    Holds the documents by id, the facet counts behind /stats and /filters,
+    and an inverted index for /search. Adding or removing a document only
+    touches that document's own terms and facets, so nothing is rebuilt.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.docs: Dict[str, dict] = {}
+        self.facets: Dict[str, Counter] = {field: Counter() for field in FACET_FIELDS}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_terms: Dict[str, Counter] = {}
+        self.content_refs: Counter = Counter()  # content_hash -> documents sharing that preview
+        self.file_refs: Counter = Counter()  # filename under uploads/ -> documents pointing at it
+        # Vector lengths are stored when a document is indexed, using the idf of
+        # that moment. They are all recomputed once NORM_REFRESH_FRACTION of the
+        # corpus has changed, which bounds the drift at an amortized O(doc size).
+        self._norms: Dict[str, float] = {}
+        self._changes_since_norms = 0
+        # /similar results, each registered under its query document and query terms
+        # so that indexing a document drops only the results it could change.
+        self._similar_cache: "OrderedDict[tuple, Tuple[list, list]]" = OrderedDict()
+        self._similar_deps: Dict[tuple, set] = {}
+
+    def __len__(self):
+        return len(self.docs)
+
+    def get(self, doc_id: str) -> Optional[dict]:
+        return self.docs.get(doc_id)
+
+    def documents(self) -> list:
+        with self.lock:
+            return list(self.docs.values())
+
+    def add(self, doc: dict, terms: Optional[Counter] = None, bulk: bool = False) -> None:
+        """Index one document. With `bulk`, norms are left for refresh_norms()."""
+        with self.lock:
+            doc_id = doc["id"]
+            if doc_id in self.docs:
+                self._unindex(doc_id)
+            self.docs[doc_id] = doc
+            self._index(doc, terms if terms is not None else term_counts(doc))
+            if not bulk:
+                self.norm(doc_id)
+                self._count_change()
+
+    def remove(self, doc_id: str) -> Optional[dict]:
+        with self.lock:
+            if doc_id not in self.docs:
+                return None
+            self._unindex(doc_id)
+            doc = self.docs.pop(doc_id)
+            self._count_change()
+            return doc
+
+    def _count_change(self) -> None:
+        self._changes_since_norms += 1
+        if self._changes_since_norms > len(self.docs) * NORM_REFRESH_FRACTION:
+            self.refresh_norms()
+
+    def refresh_norms(self) -> None:
+        with self.lock:
+            self._norms = {}
+            for doc_id in self.docs:
+                self.norm(doc_id)
+            self._changes_since_norms = 0
+            self._similar_cache.clear()  # every score changes with the norms
+            self._similar_deps.clear()
+
+    def _index(self, doc: dict, terms: Counter) -> None:
+        for field in FACET_FIELDS:
+            self.facets[field][doc.get(field)] += 1
+        if doc.get("content_hash"):
+            self.content_refs[doc["content_hash"]] += 1
+        if doc.get("filename"):
+            self.file_refs[doc["filename"]] += 1
+        self._invalidate_similar(doc["id"], terms)
+        self.doc_terms[doc["id"]] = terms
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[doc["id"]] = tf
+
+    def _unindex(self, doc_id: str) -> None:
+        doc = self.docs[doc_id]
+        for field in FACET_FIELDS:
+            counts = self.facets[field]
+            value = doc.get(field)
+            counts[value] -= 1
+            if counts[value] <= 0:
+                del counts[value]
+        if doc.get("content_hash"):
+            self.content_refs[doc["content_hash"]] -= 1
+            if self.content_refs[doc["content_hash"]] <= 0:
+                del self.content_refs[doc["content_hash"]]
+        if doc.get("filename"):
+            self.file_refs[doc["filename"]] -= 1
+            if self.file_refs[doc["filename"]] <= 0:
+                del self.file_refs[doc["filename"]]
+        self._norms.pop(doc_id, None)
+        self._invalidate_similar(doc_id, self.doc_terms.get(doc_id, {}))
+        for term in self.doc_terms.pop(doc_id, {}):
+            postings = self.postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self.postings[term]
+
+    def idf(self, term: str) -> float:
+        # Smoothed idf, as in TfidfVectorizer
+        df = len(self.postings.get(term, ()))
+        return math.log((1 + len(self.docs)) / (1 + df)) + 1
+
+    def _invalidate_similar(self, doc_id: str, terms: Iterable[str]) -> None:
+        # A cached result can only change if this document is its query or shares one
+        # of its query terms; any document in a result shares such a term.
+        if not self._similar_cache:
+            return
+        for dep in [("doc", doc_id), *(("term", t) for t in terms)]:
+            for key in self._similar_deps.pop(dep, ()):
+                self._drop_similar(key)
+
+    def _drop_similar(self, key: tuple) -> None:
+        entry = self._similar_cache.pop(key, None)
+        if entry is None:
+            return
+        for dep in entry[1]:
+            keys = self._similar_deps.get(dep)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._similar_deps[dep]
+
+    def norm(self, doc_id: str) -> float:
+        if doc_id not in self._norms:
+            terms = self.doc_terms.get(doc_id, {})
+            self._norms[doc_id] = math.sqrt(sum((tf * self.idf(t)) ** 2 for t, tf in terms.items())) or 1.0
+        return self._norms[doc_id]
+
+    def search(self, query: str, limit: int = 5) -> list:
+        """Rank documents by TF-IDF cosine similarity, walking only the query terms' postings."""
+        with self.lock:
+            scores: Dict[str, float] = {}
+            for term, qtf in Counter(tokenize(query)).items():
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                weight = qtf * self.idf(term) ** 2
+                for doc_id, tf in postings.items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + weight * tf
+            ranked = sorted(scores, key=lambda d: scores[d] / self.norm(d), reverse=True)
+            return [self.docs[d] for d in ranked[:limit]]
+
+    def similar(self, doc_id: str, limit: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[Tuple[dict, float]]:
+        """Nearest neighbours of a stored document by approximate TF-IDF cosine similarity.
+
+        Only the document's strongest terms are looked up, so cost depends on
+        their posting lists rather than the corpus size. The score is the dot
+        product over those terms divided by the full stored vector lengths, so
+        it slightly underestimates the exact cosine. Results are cached until
+        a document sharing one of the query terms is added, changed or removed.
+        """
+        filters = {k: v for k, v in (filters or {}).items() if v is not None}
+        key = (doc_id, limit, tuple(sorted(filters.items())))
+        with self.lock:
+            if key in self._similar_cache:
+                self._similar_cache.move_to_end(key)
+                return self._similar_cache[key][0]
+
+            weights = {t: tf * self.idf(t) for t, tf in self.doc_terms.get(doc_id, {}).items()}
+            query_terms = heapq.nlargest(SIMILAR_QUERY_TERMS, weights, key=weights.get)
+            scores: Dict[str, float] = {}
+            for term in query_terms:
+                weight = weights[term] * self.idf(term)
+                for other, tf in self.postings[term].items():
+                    if other != doc_id:
+                        scores[other] = scores.get(other, 0.0) + weight * tf
+
+            candidates = (
+                (other, score / (self.norm(other) * self.norm(doc_id)))
+                for other, score in scores.items()
+                if all(self.docs[other].get(field) == value for field, value in filters.items())
+            )
+            result = [(self.docs[d], score) for d, score in heapq.nlargest(limit, candidates, key=lambda c: c[1])]
+
+            deps = [("doc", doc_id), *(("term", t) for t in query_terms)]
+            self._similar_cache[key] = (result, deps)
+            for dep in deps:
+                self._similar_deps.setdefault(dep, set()).add(key)
+            if len(self._similar_cache) > SIMILAR_CACHE_SIZE:
+                self._drop_similar(next(iter(self._similar_cache)))
+            return result
+
+
+_document_index: Optional[DocumentIndex] = None
+_document_index_mtime: Optional[int] = None  # data.json mtime the index was loaded from or last saved as
+# Held while (re)loading the index and by every writer, around get_index() and
+# persist_index(), so a write can never land on an index that was replaced.
+_document_index_lock = threading.RLock()
+
+
+def data_file_mtime() -> Optional[int]:
+    try:
+        return DATA_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def get_index() -> DocumentIndex:
+    """Return the live index, reloading it if data.json was changed outside the server.
+
+    Writes made through the API keep the index current themselves; the mtime
+    check picks up add_sample_docs.py runs and hand edits.
+    """
+    if _document_index is None or data_file_mtime() != _document_index_mtime:
+        with _document_index_lock:
+            if _document_index is None or data_file_mtime() != _document_index_mtime:
+                load_index()
+    return _document_index
+
+
+def load_index() -> None:
+    global _document_index, _document_index_mtime
+    started = time.perf_counter()
+    try:
+        data = load_data()
+    except ValueError:
+        if _document_index is None:
+            raise
+        return  # data.json is mid-write or broken; keep serving the last good index and retry next time
+    if assign_document_ids(data):
+        save_data(data)
+    _document_index = build_index(data)
+    _document_index_mtime = data_file_mtime()
+    STARTUP_TIMINGS["index_load_seconds"] = round(time.perf_counter() - started, 3)
+    STARTUP_TIMINGS["index_error"] = None
+
+
+def build_index(docs: list, workers: int = 1) -> DocumentIndex:
+    """Build an index from scratch, tokenizing across `workers` processes when > 1."""
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            all_terms = list(pool.map(term_counts, docs, chunksize=256))
+    else:
+        all_terms = [term_counts(doc) for doc in docs]
+    index = DocumentIndex()
+    for doc, terms in zip(docs, all_terms):
+        index.add(doc, terms, bulk=True)
+    index.refresh_norms()  # once all document frequencies are known
+    return index
+
+
+def rebuild_index(workers: int = 1) -> DocumentIndex:
+    """Replace the live index with a fresh build. Writers wait until the swap is done."""
+    global _document_index
+    with _document_index_lock:
+        new = build_index(get_index().documents(), workers=workers)
+        _document_index = new
+    return new
+
+
+def persist_index(index: DocumentIndex) -> None:
+    # data.json has no incremental format, so every write saves the whole corpus
+    # while holding the writer lock; batch bulk changes (see import_ndjson).
+    global _document_index_mtime
+    with _document_index_lock:
+        save_data(index.documents())
+        _document_index_mtime = data_file_mtime()
+
+
+def compression_for(filename: str) -> str:
+    name = filename.lower()
+    if name.endswith(".gz"):
+        return "gzip"
+    if name.endswith((".zst", ".zstd")):
+        return "zstd"
+    return "none"
+
+
+def check_compression(compression: str) -> None:
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression '{compression}'. Choose one of: {', '.join(COMPRESSIONS)}.")
+    if compression == "zstd" and get_zstandard() is None:
+        raise ValueError("zstd compression needs the 'zstandard' package (pip install zstandard).")
+
+
+def content_document_id(doc: dict) -> str:
+    """Id derived from a record's content, so re-importing or re-exporting it gives the same id."""
+    content = {key: value for key, value in doc.items() if key != "id"}
+    return uuid.uuid5(uuid.NAMESPACE_OID, json.dumps(content, sort_keys=True)).hex
+
+
+def iter_index_documents(index: DocumentIndex) -> Iterator[dict]:
+    with index.lock:
+        doc_ids = list(index.docs)  # snapshot of ids only; documents are serialized one at a time
+    for doc_id in doc_ids:
+        doc = index.get(doc_id)
+        if doc is not None:  # skip documents deleted while exporting
+            yield doc
+
+
+def iter_export_chunks(docs: Iterable[dict]) -> Iterator[bytes]:
+    """Yield documents as NDJSON, one per line, in ~64 KB chunks."""
+    buffer = []
+    size = 0
+    for doc in docs:
+        if not doc.get("id"):
+            doc = {**doc, "id": content_document_id(doc)}  # only the exported line gets the id
+        line = (json.dumps(doc, ensure_ascii=False) + "\n").encode("utf-8")
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_SIZE:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def compress_chunks(chunks: Iterable[bytes], compression: str) -> Iterator[bytes]:
+    check_compression(compression)
+    if compression == "none":
+        yield from chunks
+        return
+    if compression == "gzip":
+        compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    else:
+        compressor = get_zstandard().ZstdCompressor().compressobj()
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def read_ndjson_lines(raw: BinaryIO, compression: str) -> Iterator[str]:
+    """Yield decoded lines; a corrupt or truncated stream raises ValueError."""
+    check_compression(compression)
+    stream_errors: Tuple[type, ...] = (OSError, EOFError, UnicodeDecodeError)  # BadGzipFile is an OSError
+    if compression == "gzip":
+        raw = gzip.GzipFile(fileobj=raw, mode="rb")
+    elif compression == "zstd":
+        raw = get_zstandard().ZstdDecompressor().stream_reader(raw)
+        stream_errors += (get_zstandard().ZstdError,)
+    try:
+        yield from io.TextIOWrapper(raw, encoding="utf-8")
+    except stream_errors as e:
+        raise ValueError(f"The file is corrupt or not UTF-8 NDJSON ({e}).")
+
+
+def clean_import_record(doc: Any, line_no: int) -> dict:
+    """Check an imported record's field types, coercing numeric year strings."""
+    if not isinstance(doc, dict):
+        raise ValueError(f"Line {line_no} is not a JSON object.")
+    if doc.get("id") is not None and not isinstance(doc["id"], str):
+        raise ValueError(f"Line {line_no}: 'id' must be a string.")
+    for field in ("filename", "summary", "text", "category", "department", "content_hash"):
+        if doc.get(field) is not None and not isinstance(doc[field], str):
+            raise ValueError(f"Line {line_no}: '{field}' must be a string or null.")
+    year = doc.get("year")
+    if isinstance(year, str) and year.strip().isdigit():
+        doc["year"] = int(year)
+    elif year is not None and (isinstance(year, bool) or not isinstance(year, int)):
+        raise ValueError(f"Line {line_no}: 'year' must be an integer or null.")
+    tags = doc.get("tags")
+    if tags is not None and (not isinstance(tags, list) or not all(isinstance(t, str) for t in tags)):
+        raise ValueError(f"Line {line_no}: 'tags' must be a list of strings.")
+    return doc
+
+
+def import_ndjson(
+    lines: Iterable[str],
+    batch_size: int = IMPORT_BATCH_SIZE,
+    skip_lines: int = 0,
+    on_commit: Optional[Callable[[int], None]] = None,
+) -> dict:
+    """Stream NDJSON documents into the store, committing every `batch_size` records.
+
+    Documents whose id is already present are skipped, so re-running an
+    interrupted import is safe. Records without an id get one derived from
+    their content for the same reason. `on_commit` receives the last line
+    number that is durably stored, for checkpointing.
+    """
+    stats = {"imported": 0, "skipped": 0, "lines": skip_lines}
+    batch: Dict[str, dict] = {}
+
+    def commit(line_no: int) -> None:
+        with _document_index_lock:
+            index = get_index()
+            for doc in batch.values():
+                if index.get(doc["id"]) is None:
+                    index.add(doc)
+                    stats["imported"] += 1
+                else:
+                    stats["skipped"] += 1
+            persist_index(index)
+        batch.clear()
+        if on_commit:
+            on_commit(line_no)
+
+    line_no = 0
+    for line_no, line in enumerate(lines, 1):
+        if line_no <= skip_lines or not line.strip():
+            continue
+        try:
+            doc = json.loads(line)
+        except ValueError:
+            raise ValueError(f"Line {line_no} is not valid JSON.")
+        doc = clean_import_record(doc, line_no)
+        if not doc.get("id"):
+            doc["id"] = content_document_id(doc)
+        if doc["id"] in batch or get_index().get(doc["id"]) is not None:
+            stats["skipped"] += 1
+            continue
+        batch[doc["id"]] = doc
+        if len(batch) >= batch_size:
+            commit(line_no)
+    if batch:
+        commit(line_no)
+    elif on_commit:
+        on_commit(line_no)
+    stats["lines"] = max(line_no, skip_lines)
+    return stats
 
 
 def create_access_token(data: dict):
@@ -129,7 +689,27 @@ def verify_token(token: str):
         raise HTTPException(status_code=401, detail="❌ Session expired or invalid. Please login again.")
 
 
+def get_current_user(authorization: Optional[str]) -> dict:
+    """Resolve the user from an `Authorization: Bearer <token>` header."""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        raise HTTPException(status_code=401, detail="❌ Missing or invalid Authorization header. Please login again.")
+    return verify_token(authorization.split(" ", 1)[1])
+
+
+def require_admin(authorization: Optional[str]) -> dict:
+    user = get_current_user(authorization)
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="❌ Only admins can do this.")
+    return user
+
+
+def check_can_modify(doc: dict, user: dict) -> None:
+    if user.get("role") != "admin" and doc.get("uploader") != user.get("sub"):
+        raise HTTPException(status_code=403, detail="❌ You can only modify documents you uploaded.")
+
+
 def extract_text_from_pdf(pdf_path: Path) -> str:
+    import fitz
     text = ""
     try:
         with fitz.open(pdf_path) as doc:
@@ -152,6 +732,7 @@ def extract_text_from_docx(docx_path: Path) -> str:
 
 def generate_summary_and_category(text: str):
     """Uses OpenAI (if available) to auto summarize and extract metadata."""
+    client = get_openai_client()
     if client is None:
         return "AI summarization disabled (no key)", "Others", {}
 
@@ -201,12 +782,125 @@ Document text:
         return "Summary error", "Others", {}
 
 
+def make_snippet(text: str) -> str:
+    return " ".join(text[: SNIPPET_CHARS * 2].split())[:SNIPPET_CHARS]
+
+
+def generate_previews(file_path: Path, ext: str, text: str, content_hash: str) -> dict:
+    """Write the first-page thumbnail and text snippet under previews/, keyed by content hash.
+
+    Identical files share one set of previews, so work already done is skipped.
+    """
+    snippet = make_snippet(text)
+    snippet_path = PREVIEW_DIR / f"{content_hash}.txt"
+    if not snippet_path.exists():
+        snippet_path.write_text(snippet, encoding="utf-8")
+
+    thumbnail = None
+    if ext == ".pdf":
+        thumb_path = PREVIEW_DIR / f"{content_hash}.png"
+        if not thumb_path.exists():
+            try:
+                import fitz
+                with fitz.open(file_path) as doc:
+                    page = doc[0]
+                    zoom = THUMBNAIL_WIDTH / page.rect.width
+                    page.get_pixmap(matrix=fitz.Matrix(zoom, zoom)).save(str(thumb_path))
+            except Exception as e:
+                print("Thumbnail error:", e)
+        if thumb_path.exists():
+            thumbnail = f"/previews/{thumb_path.name}"
+
+    return {"content_hash": content_hash, "thumbnail": thumbnail, "snippet": snippet}
+
+
+def store_uploaded_document(doc: dict, file_path: Path, ext: str) -> None:
+    """Add an upload to the index and data.json.
+
+    Previews are checked again under the writer lock: a DELETE of the last document
+    sharing this content hash may have removed them since they were generated.
+    """
+    with _document_index_lock:
+        doc.update(generate_previews(file_path, ext, doc["text"], doc["content_hash"]))
+        index = get_index()
+        index.add(doc)
+        persist_index(index)
+
+
+def remove_previews(content_hash: str) -> None:
+    for suffix in (".png", ".txt"):
+        (PREVIEW_DIR / f"{content_hash}{suffix}").unlink(missing_ok=True)
+
+
+def parse_range_header(range_header: str, file_size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single `bytes=start-end` range. Returns None to serve the whole file."""
+    if "," in range_header:
+        return None  # multipart ranges are not supported; a full response is valid
+    match = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", range_header)
+    if not match or match.groups() == ("", ""):
+        return None
+    start, end = match.groups()
+    if start and end and int(end) < int(start):
+        return None  # invalid range: ignore the header (RFC 9110 §14.2)
+    if start == "":
+        start, end = max(file_size - int(end), 0), file_size - 1
+    else:
+        start, end = int(start), min(int(end), file_size - 1) if end else file_size - 1
+    if start >= file_size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="❌ Requested range not satisfiable.",
+            headers={"Content-Range": f"bytes */{file_size}"},
+        )
+    return start, end
+
+
+def file_validators(stat_result: os.stat_result) -> Dict[str, str]:
+    """ETag and Last-Modified for a file, computed the way FileResponse does."""
+    etag = hashlib.md5(f"{stat_result.st_mtime}-{stat_result.st_size}".encode()).hexdigest()
+    return {"ETag": f'"{etag}"', "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True)}
+
+
+def not_modified(validators: Dict[str, str], if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    """Conditional GET check, same rules as StaticFiles: If-None-Match wins over If-Modified-Since."""
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or validators["ETag"] in tags
+    if if_modified_since:
+        try:
+            return parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(validators["Last-Modified"])
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+async def iter_file_range(path: Path, start: int, end: int):
+    async with await anyio.open_file(path, "rb") as f:
+        await f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await f.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
 # -------- routes --------
 @app.get("/")
 def health():
     return {"message": "✅ Findly backend is running!"}
 
 
+@app.get("/ready")
+def ready():
+    """Readiness probe: 503 until the search index is loaded, plus startup timings and any load error."""
+    body = {"ready": _document_index is not None, **STARTUP_TIMINGS}
+    if not body["ready"]:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+
 @app.post("/signup")
 def signup(payload: SignupIn):
     users = load_users()
@@ -217,7 +911,7 @@ def signup(payload: SignupIn):
         {
             "name": payload.name,
             "email": payload.email,
-            "password": pwd_context.hash(payload.password),
+            "password": get_pwd_context().hash(payload.password),
             "role": payload.role,
             "branch": payload.branch if payload.role == "student" else None,
             "semester": payload.semester if payload.role == "student" else None,
@@ -231,7 +925,7 @@ def signup(payload: SignupIn):
 def login(payload: LoginIn):
     users = load_users()
     for u in users:
-        if u["email"] == payload.email and pwd_context.verify(payload.password, u["password"]):
+        if u["email"] == payload.email and get_pwd_context().verify(payload.password, u["password"]):
             token = create_access_token(
                 {
                     "sub": u["email"],
@@ -274,6 +968,7 @@ async def upload_pdf(file: UploadFile = File(...), token: str = Form(...)):
         )
 
     # Save file
+    content_hash = hashlib.sha256(contents).hexdigest()
     safe_name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}"
     file_path = UPLOAD_DIR / safe_name
     with open(file_path, "wb") as f:
@@ -286,46 +981,106 @@ async def upload_pdf(file: UploadFile = File(...), token: str = Form(...)):
         text = extract_text_from_docx(file_path)
 
     summary, category, metadata = generate_summary_and_category(text)
+    previews = await run_in_threadpool(generate_previews, file_path, ext, text, content_hash)
+
+    doc = {
+        "id": new_document_id(),
+        "filename": safe_name,
+        "summary": summary,
+        "category": category,
+        "department": metadata.get("department"),
+        "year": metadata.get("year"),
+        "tags": metadata.get("tags", []),
+        "uploader": user["sub"],
+        "role": user["role"],
+        "branch": user.get("branch"),
+        "semester": user.get("semester"),
+        "timestamp": datetime.now().isoformat(),
+        "text": text[:10000],  # Store first 10k chars for search
+        **previews,
+    }
+    await run_in_threadpool(store_uploaded_document, doc, file_path, ext)
 
-    data = load_data()
-    data.append(
-        {
-            "filename": safe_name,
-            "summary": summary,
-            "category": category,
-            "department": metadata.get("department"),
-            "year": metadata.get("year"),
-            "tags": metadata.get("tags", []),
-            "uploader": user["sub"],
-            "role": user["role"],
-            "branch": user.get("branch"),
-            "semester": user.get("semester"),
-            "timestamp": datetime.now().isoformat(),
-            "text": text[:10000],  # Store first 10k chars for search
-        }
-    )
-    save_data(data)
-
-    return {"message": "Uploaded successfully", "summary": summary, "category": category, "metadata": metadata}
+    return {"message": "Uploaded successfully", "id": doc["id"], "thumbnail": doc["thumbnail"], "summary": summary, "category": category, "metadata": metadata}
 
 
 @app.get("/documents")
 def list_documents():
-    return load_data()
+    return get_index().documents()
+
+
+@app.get("/documents/{doc_id}/similar")
+def similar_documents(
+    doc_id: str,
+    limit: int = Query(10, ge=1, le=50),
+    department: Optional[str] = None,
+    year: Optional[int] = None,
+    document_type: Optional[str] = None,
+):
+    """More like this: documents closest to `doc_id`, optionally narrowed by metadata."""
+    index = get_index()
+    if index.get(doc_id) is None:
+        raise HTTPException(status_code=404, detail="❌ Document not found.")
+
+    filters = {"department": department, "year": year, "category": document_type}
+    neighbours = index.similar(doc_id, limit=limit, filters=filters)
+    return {
+        "id": doc_id,
+        "results": [{**doc, "score": round(score, 4)} for doc, score in neighbours],
+        "total": len(neighbours),
+        "filters_applied": {"department": department, "year": year, "document_type": document_type},
+    }
+
+
+@app.patch("/documents/{doc_id}")
+def update_document(doc_id: str, payload: DocumentMetadata, authorization: Optional[str] = Header(None)):
+    """Edit a document's metadata; only that document's index entries are refreshed."""
+    user = get_current_user(authorization)
+    with _document_index_lock:
+        index = get_index()
+        doc = index.get(doc_id)
+        if doc is None:
+            raise HTTPException(status_code=404, detail="❌ Document not found.")
+        check_can_modify(doc, user)
+
+        changes = payload.model_dump(exclude_unset=True)
+        if changes.get("department") is not None and changes["department"] not in DEPARTMENTS:
+            raise HTTPException(status_code=400, detail=f"❌ Unknown department '{changes['department']}'. Choose one of: {', '.join(DEPARTMENTS)}.")
+        if changes.get("document_type") is not None and changes["document_type"] not in DOCUMENT_TYPES:
+            raise HTTPException(status_code=400, detail=f"❌ Unknown document type '{changes['document_type']}'. Choose one of: {', '.join(DOCUMENT_TYPES)}.")
+        if "document_type" in changes:
+            changes["category"] = changes.pop("document_type")
+
+        updated = {**doc, **changes, "updated_at": datetime.now().isoformat()}
+        index.add(updated)
+        persist_index(index)
+    return updated
+
+
+@app.delete("/documents/{doc_id}")
+def delete_document(doc_id: str, authorization: Optional[str] = Header(None)):
+    """Remove a document, its index entries and its file under uploads/."""
+    user = get_current_user(authorization)
+    with _document_index_lock:
+        index = get_index()
+        doc = index.get(doc_id)
+        if doc is None:
+            raise HTTPException(status_code=404, detail="❌ Document not found.")
+        check_can_modify(doc, user)
+        index.remove(doc_id)
+        persist_index(index)
+        # Unlink under the lock so a concurrent upload cannot start sharing these files first
+        if doc.get("filename") and doc["filename"] not in index.file_refs:
+            (UPLOAD_DIR / Path(doc["filename"]).name).unlink(missing_ok=True)
+        if doc.get("content_hash") and doc["content_hash"] not in index.content_refs:
+            remove_previews(doc["content_hash"])
+    return {"message": "Deleted successfully", "id": doc_id}
 
 
 @app.get("/search")
 def search(query: str):
     """Basic TF-IDF search for documents"""
-    data = load_data()
-    if not data:
-        return []
-    docs = [d["text"] for d in data]
-    vectorizer = TfidfVectorizer().fit(docs + [query])
-    matrix = vectorizer.transform(docs + [query])
-    similarity = cosine_similarity(matrix[-1], matrix[:-1]).flatten()
-    ranked = sorted(zip(similarity, data), reverse=True)
-    return [r[1] for r in ranked[:5]]
+    return get_index().search(query, limit=5)
 
 
 @app.post("/chat-search")
@@ -357,7 +1112,7 @@ async def chat_search(payload: ChatQuery, authorization: Optional[str] = Header(
             break
     
     # Load and filter documents
-    data = load_data()
+    data = get_index().documents()
     if not data:
         return {"results": [], "total": 0, "query_understanding": {}}
     
@@ -391,6 +1146,8 @@ async def chat_search(payload: ChatQuery, authorization: Optional[str] = Header(
             docs_text.append(' '.join(filter(None, searchable_parts)))
         
         try:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            from sklearn.metrics.pairwise import cosine_similarity
             vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
             matrix = vectorizer.fit_transform(docs_text + [query])
             similarity = cosine_similarity(matrix[-1], matrix[:-1]).flatten()
@@ -437,28 +1194,79 @@ async def chat_search(payload: ChatQuery, authorization: Optional[str] = Header(
     }
 
 
+@app.get("/export")
+def export_corpus(compression: str = "none", authorization: Optional[str] = Header(None)):
+    """Stream every document as NDJSON, optionally gzip- or zstd-compressed."""
+    require_admin(authorization)
+    try:
+        check_compression(compression)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"❌ {e}")
+
+    suffix = {"none": "", "gzip": ".gz", "zstd": ".zst"}[compression]
+    return StreamingResponse(
+        compress_chunks(iter_export_chunks(iter_index_documents(get_index())), compression),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="findly-export.ndjson{suffix}"'},
+    )
+
+
+@app.post("/import")
+def import_corpus(
+    file: UploadFile = File(...),
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1),
+    rebuild: bool = False,
+    workers: int = Query(1, ge=1),
+    authorization: Optional[str] = Header(None),
+):
+    """Load an NDJSON export (.ndjson, .ndjson.gz or .ndjson.zst) in batches.
+
+    Already-present ids are skipped, so a failed import can simply be re-sent.
+    """
+    require_admin(authorization)
+    try:
+        lines = read_ndjson_lines(file.file, compression_for(file.filename or ""))
+        stats = import_ndjson(lines, batch_size=batch_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"❌ Import stopped: {e} Earlier batches were saved; re-send the file to resume.")
+    if rebuild:
+        rebuild_index(workers=workers)
+    return {"message": "Imported successfully", **stats, "rebuilt": rebuild}
+
+
+@app.post("/reindex")
+def reindex(workers: int = Query(1, ge=1), authorization: Optional[str] = Header(None)):
+    """Rebuild the search index and facet counts from the stored documents."""
+    require_admin(authorization)
+    index = rebuild_index(workers=workers)
+    return {"message": "Index rebuilt", "total_documents": len(index)}
+
+
 @app.get("/stats")
 def get_stats():
     """Get platform statistics"""
-    data = load_data()
+    index = get_index()
     users = load_users()
-    
-    # Calculate statistics
-    total_docs = len(data)
-    docs_by_dept = {}
-    docs_by_type = {}
-    docs_by_year = {}
-    
-    for doc in data:
-        dept = doc.get("department", "Unknown")
-        docs_by_dept[dept] = docs_by_dept.get(dept, 0) + 1
-        
-        doc_type = doc.get("category", "Other")
-        docs_by_type[doc_type] = docs_by_type.get(doc_type, 0) + 1
-        
-        year = doc.get("year", "Unknown")
-        docs_by_year[str(year)] = docs_by_year.get(str(year), 0) + 1
-    
+
+    # Facet counts are maintained by the index as documents change
+    with index.lock:
+        docs_by_dept = {}
+        for dept, count in index.facets["department"].items():
+            key = dept or "Unknown"
+            docs_by_dept[key] = docs_by_dept.get(key, 0) + count
+
+        docs_by_type = {}
+        for doc_type, count in index.facets["category"].items():
+            key = doc_type or "Other"
+            docs_by_type[key] = docs_by_type.get(key, 0) + count
+
+        docs_by_year = {}
+        for year, count in index.facets["year"].items():
+            key = str(year or "Unknown")
+            docs_by_year[key] = docs_by_year.get(key, 0) + count
+
+        total_docs = len(index)
+
     return {
         "total_documents": total_docs,
         "total_users": len(users),
@@ -471,20 +1279,12 @@ def get_stats():
 @app.get("/filters")
 def get_available_filters():
     """Get available filter options"""
-    data = load_data()
-    
-    departments = set()
-    years = set()
-    types = set()
-    
-    for doc in data:
-        if doc.get("department"):
-            departments.add(doc["department"])
-        if doc.get("year"):
-            years.add(doc["year"])
-        if doc.get("category"):
-            types.add(doc["category"])
-    
+    index = get_index()
+    with index.lock:
+        departments = {d for d in index.facets["department"] if d}
+        years = {y for y in index.facets["year"] if y}
+        types = {t for t in index.facets["category"] if t}
+
     return {
         "departments": sorted(list(departments)),
         "years": sorted(list(years), reverse=True),
@@ -492,4 +1292,62 @@ def get_available_filters():
     }
 
 
-app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
+@app.api_route("/uploads/{filename}", methods=["GET", "HEAD"])
+async def serve_upload(
+    filename: str,
+    range: Optional[str] = Header(None),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+):
+    """Serve an uploaded file, honouring single `Range: bytes=` requests so PDFs can stream."""
+    file_path = UPLOAD_DIR / Path(filename).name
+    if not file_path.is_file():
+        raise HTTPException(status_code=404, detail="❌ File not found.")
+
+    stat_result = file_path.stat()
+    file_size = stat_result.st_size
+    validators = file_validators(stat_result)
+    if not_modified(validators, if_none_match, if_modified_since):
+        return Response(status_code=304, headers={"Accept-Ranges": "bytes", **validators})
+    byte_range = parse_range_header(range, file_size) if range else None
+    if byte_range is not None and if_range and if_range not in validators.values():
+        byte_range = None  # file changed since the client's copy; send it whole
+    if byte_range is None:
+        return FileResponse(file_path, stat_result=stat_result, headers={"Accept-Ranges": "bytes", **validators})
+
+    start, end = byte_range
+    media_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+    return StreamingResponse(
+        iter_file_range(file_path, start, end),
+        status_code=206,
+        media_type=media_type,
+        headers={
+            "Accept-Ranges": "bytes",
+            "Content-Range": f"bytes {start}-{end}/{file_size}",
+            "Content-Length": str(end - start + 1),
+            **validators,
+        },
+    )
+
+
+@app.get("/previews/{name}")
+async def serve_preview(
+    name: str,
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+):
+    """Serve a thumbnail (.png) or snippet (.txt). Names are content hashes, so they never change."""
+    if not re.fullmatch(r"[0-9a-f]{64}\.(png|txt)", name):
+        raise HTTPException(status_code=404, detail="❌ Preview not found.")
+    preview_path = PREVIEW_DIR / name
+    if not preview_path.is_file():
+        raise HTTPException(status_code=404, detail="❌ Preview not found.")
+    stat_result = preview_path.stat()
+    validators = file_validators(stat_result)
+    if not_modified(validators, if_none_match, if_modified_since):
+        return Response(status_code=304, headers={"Cache-Control": PREVIEW_CACHE_CONTROL, **validators})
+    return FileResponse(preview_path, stat_result=stat_result, headers={"Cache-Control": PREVIEW_CACHE_CONTROL, **validators})
+
+
+STARTUP_TIMINGS["import_seconds"] = round(time.perf_counter() - _IMPORT_START, 3)
@@ -5,6 +5,8 @@ Tests the main API endpoints to verify functionality
 
 import requests
 import json
+import gzip
+import time
 
 BASE_URL = "http://localhost:8000"
 
@@ -16,6 +18,25 @@ def test_health():
     print(f"Response: {response.json()}")
     return response.status_code == 200
 
+def test_ready():
+    """Test the readiness probe and startup timings"""
+    print("\n⏱️ Testing readiness...")
+    for _ in range(30):
+        response = requests.get(f"{BASE_URL}/ready")
+        if response.status_code != 503:
+            break
+        time.sleep(1)  # index still loading in the background
+    print(f"✅ Status: {response.status_code}")
+    assert response.status_code == 200
+    data = response.json()
+    print(f"Timings: {data}")
+    assert data["ready"] is True and data["index_error"] is None
+    assert data["import_seconds"] >= 0 and data["index_load_seconds"] >= 0
+    # The health check above was the first request, so its timing is recorded
+    assert data["time_to_first_request_seconds"] > 0
+    assert data["first_request_measured_from"] in ("process_start", "main_import")
+    return True
+
 def test_login():
     """Test login with default admin"""
     print("\n🔐 Testing login...")
@@ -115,6 +136,166 @@ def test_documents():
             print(f"  Department: {sample.get('department', 'N/A')}")
             print(f"  Year: {sample.get('year', 'N/A')}")
 
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+def upload_test_doc(token, name="smoke_test.txt", content=b"Findly smoke test document about compilers and parsing"):
+    """Upload a small text file and return its document record"""
+    response = requests.post(f"{BASE_URL}/upload", files={"file": (name, content)}, data={"token": token})
+    if response.status_code != 200:
+        print(f"⚠️ Upload failed: {response.status_code} {response.json()}")
+        return None
+    doc_id = response.json()["id"]
+    return next(d for d in requests.get(f"{BASE_URL}/documents").json() if d["id"] == doc_id)
+
+def test_update_and_delete(token):
+    """Test uploading, PATCH and DELETE of a document"""
+    print("\n✏️ Testing update and delete...")
+    doc = upload_test_doc(token)
+    if not doc:
+        return False
+    doc_id = doc["id"]
+    file_url = f"{BASE_URL}/uploads/{doc['filename']}"
+
+    # PATCH
+    response = requests.patch(
+        f"{BASE_URL}/documents/{doc_id}",
+        json={"department": "CIVIL", "year": 2019, "document_type": "Thesis"},
+        headers=auth(token),
+    )
+    print(f"  PATCH: {response.status_code} -> {response.json().get('category')}")
+    assert response.status_code == 200 and response.json()["category"] == "Thesis"
+    filters = requests.get(f"{BASE_URL}/filters").json()
+    assert "CIVIL" in filters["departments"] and 2019 in filters["years"]
+    bad = requests.patch(f"{BASE_URL}/documents/{doc_id}", json={"department": ""}, headers=auth(token))
+    assert bad.status_code == 400
+    assert requests.patch(f"{BASE_URL}/documents/{doc_id}", json={"year": 2020}).status_code == 401
+
+    # DELETE
+    response = requests.delete(f"{BASE_URL}/documents/{doc_id}", headers=auth(token))
+    print(f"  DELETE: {response.status_code}")
+    assert response.status_code == 200
+    assert requests.delete(f"{BASE_URL}/documents/{doc_id}", headers=auth(token)).status_code == 404
+    assert requests.get(file_url).status_code == 404
+    print("✅ Update and delete work")
+    return True
+
+def test_file_download(token):
+    """Test ranged and conditional downloads of an uploaded file"""
+    print("\n📥 Testing file downloads...")
+    doc = upload_test_doc(token, name="range_test.txt")
+    if not doc:
+        return False
+    file_url = f"{BASE_URL}/uploads/{doc['filename']}"
+    full = requests.get(file_url)
+    etag = full.headers.get("ETag")
+
+    partial = requests.get(file_url, headers={"Range": "bytes=0-9"})
+    print(f"  Range bytes=0-9: {partial.status_code} {partial.headers.get('Content-Range')}")
+    assert partial.status_code == 206 and partial.content == full.content[:10]
+    assert partial.headers.get("ETag") == etag
+    invalid = requests.get(file_url, headers={"Range": "bytes=10-5"})
+    print(f"  Range bytes=10-5: {invalid.status_code}")
+    assert invalid.status_code == 200 and invalid.content == full.content
+    stale = requests.get(file_url, headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert stale.status_code == 200 and stale.content == full.content
+
+    cached = requests.get(file_url, headers={"If-None-Match": etag})
+    print(f"  If-None-Match: {cached.status_code}")
+    assert cached.status_code == 304 and cached.content == b""
+    since = requests.get(file_url, headers={"If-Modified-Since": full.headers["Last-Modified"]})
+    assert since.status_code == 304
+    if doc.get("snippet") is not None and doc.get("content_hash"):
+        preview_url = f"{BASE_URL}/previews/{doc['content_hash']}.txt"
+        preview = requests.get(preview_url)
+        assert preview.status_code == 200 and "immutable" in preview.headers.get("Cache-Control", "")
+        assert requests.get(preview_url, headers={"If-None-Match": preview.headers["ETag"]}).status_code == 304
+
+    requests.delete(f"{BASE_URL}/documents/{doc['id']}", headers=auth(token))
+    print("✅ Range and conditional downloads work")
+    return True
+
+def test_export_import(token):
+    """Test NDJSON export and re-import"""
+    print("\n💾 Testing export/import...")
+    response = requests.get(f"{BASE_URL}/export", params={"compression": "gzip"}, headers=auth(token))
+    print(f"Export status: {response.status_code}")
+    assert response.status_code == 200
+    lines = gzip.decompress(response.content).splitlines()
+    total = requests.get(f"{BASE_URL}/stats").json()["total_documents"]
+    print(f"  Exported {len(lines)} documents")
+    assert len(lines) == total
+
+    # Re-importing the same export changes nothing: every id already exists
+    response = requests.post(
+        f"{BASE_URL}/import",
+        files={"file": ("backup.ndjson.gz", response.content)},
+        headers=auth(token),
+    )
+    print(f"  Import: {response.json()}")
+    assert response.status_code == 200 and response.json()["imported"] == 0
+
+    bad = requests.post(
+        f"{BASE_URL}/import",
+        files={"file": ("bad.ndjson", b'{"tags": "abc", "year": "2023"}\n')},
+        headers=auth(token),
+    )
+    print(f"  Bad record: {bad.status_code} {bad.json()['detail']}")
+    assert bad.status_code == 400
+    corrupt = requests.post(
+        f"{BASE_URL}/import",
+        files={"file": ("corrupt.ndjson.gz", b"not really gzip")},
+        headers=auth(token),
+    )
+    print(f"  Corrupt file: {corrupt.status_code}")
+    assert corrupt.status_code == 400
+    print("✅ Export/import round-trip works")
+
+def make_pdf(text):
+    """Build a one-page PDF showing `text`, so uploads have extractable content"""
+    stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
+
+def test_similar(token):
+    """Test more-like-this search, including that a new upload shows up"""
+    print("\n🧲 Testing similar documents...")
+    first = upload_test_doc(token, name="similar_a.pdf", content=make_pdf("Quantum annealing schedules for lattice spin glasses"))
+    if not first:
+        return False
+    response = requests.get(f"{BASE_URL}/documents/{first['id']}/similar", params={"limit": 3})
+    print(f"✅ Status: {response.status_code}")
+    assert response.status_code == 200
+    assert all(r["id"] != first["id"] for r in response.json()["results"])
+
+    # The cached result must be dropped once a document sharing its terms arrives
+    second = upload_test_doc(token, name="similar_b.pdf", content=make_pdf("Annealing schedules for spin glasses on a quantum lattice"))
+    results = requests.get(f"{BASE_URL}/documents/{first['id']}/similar", params={"limit": 3}).json()["results"]
+    for r in results:
+        print(f"  {r['score']:.3f}  {r.get('filename', 'N/A')}")
+    assert results and results[0]["id"] == second["id"]
+    assert requests.get(f"{BASE_URL}/documents/missing/similar").status_code == 404
+
+    for doc in (first, second):
+        requests.delete(f"{BASE_URL}/documents/{doc['id']}", headers=auth(token))
+    print("✅ Similar documents work")
+    return True
+
 def main():
     print("=" * 60)
     print("🚀 Findly Backend API Test Suite")
@@ -126,6 +307,9 @@ def main():
             print("\n❌ Server is not running!")
             print("Start the server with: uvicorn main:app --reload")
             return
+
+        # Test 1b: Readiness and startup timings
+        test_ready()
         
         # Test 2: Login
         token = test_login()
@@ -144,6 +328,21 @@ def main():
         
         # Test 7: Chat search
         test_chat_search()
+
+        if token:
+            # Test 8: Update and delete
+            test_update_and_delete(token)
+
+            # Test 9: Ranged and conditional downloads
+            test_file_download(token)
+
+            # Test 10: Export/import
+            test_export_import(token)
+
+            # Test 11: Similar documents
+            test_similar(token)
+        else:
+            print("\n⚠️ Skipping update/delete, download, export/import and similar tests (login failed)")
         
         print("\n" + "=" * 60)
         print("✅ All tests completed!")